@@ -1,18 +1,21 @@
-import json
+import asyncio
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 
+import orjson
 from dotenv import load_dotenv
 from fastapi import FastAPI, Form, HTTPException, Request, WebSocket, WebSocketDisconnect
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache
 from starlette.websockets import WebSocketState
 from twilio.base.exceptions import TwilioRestException
 
+from app.middleware import FastCORS
 from app.services.config import get_settings
 from app.services.realtime_bridge import OpenAIRealtimeBridge
+from app.services.realtime_pool import RealtimeConnectionPool
 from app.services.twilio_client import TwilioCallClient
 
 load_dotenv()
@@ -22,34 +25,49 @@ logging.basicConfig(level=logging.INFO)
 
 app = FastAPI(title="Twilio + OpenAI Realtime Caller")
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+app.add_middleware(FastCORS)
 
 templates = Jinja2Templates(directory="app/templates")
+# Templates only change on deploy, so skip the per-render mtime check and reuse
+# compiled bytecode across restarts.
+templates.env.auto_reload = False
+templates.env.bytecode_cache = FileSystemBytecodeCache()
 
 settings = get_settings()
 twilio_client = TwilioCallClient(settings)
+realtime_pool = RealtimeConnectionPool(settings)
 
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
+_HEALTH_BODY = b'{"status":"ok"}'
+
+
+@app.on_event("startup")
+async def load_templates() -> None:
+    """Compile page templates up front and render the settings-only landing page once."""
+    templates.get_template("call_started.html")
+    app.state.index_bytes = templates.get_template("index.html").render(
+        default_prompt=settings.default_prompt,
+        voices=settings.supported_voices,
+        public_base_url=settings.public_base_url,
+    ).encode("utf-8")
+
+
+@app.on_event("startup")
+async def start_realtime_pool() -> None:
+    """Pre-connect OpenAI realtime sockets so calls skip the handshake."""
+    await realtime_pool.start()
+
+
+@app.on_event("shutdown")
+async def close_realtime_pool() -> None:
+    await realtime_pool.close()
+
 
 @app.get("/", response_class=HTMLResponse)
 async def index(request: Request) -> HTMLResponse:
-    """Render the landing page with the call configuration form."""
-    return templates.TemplateResponse(
-        "index.html",
-        {
-            "request": request,
-            "default_prompt": settings.default_prompt,
-            "voices": settings.supported_voices,
-            "public_base_url": settings.public_base_url,
-        },
-    )
+    """Serve the landing page with the call configuration form."""
+    return HTMLResponse(request.app.state.index_bytes)
 
 
 @app.post("/call", response_class=HTMLResponse)
@@ -65,7 +83,7 @@ async def create_call(
     if not to_number:
         raise HTTPException(status_code=400, detail="A destination phone number is required.")
 
-    if voice not in settings.supported_voices:
+    if voice not in settings.supported_voices_set:
         raise HTTPException(status_code=400, detail="The selected voice is not supported.")
 
     try:
@@ -116,63 +134,77 @@ async def media_stream(websocket: WebSocket) -> None:
         negotiated_subprotocol or "none",
     )
     bridge: Optional[OpenAIRealtimeBridge] = None
+    handle_audio_chunk: Optional[Callable[[str], None]] = None
 
     try:
-        async for raw_message in websocket.iter_text():
-            payload = json.loads(raw_message)
-            event_type = payload.get("event")
-
-            if event_type == "connected":
-                logger.info("Twilio reports stream connection established")
-
-            elif event_type == "start":
-                stream_sid = payload.get("streamSid")
-                params: Dict[str, Any] = payload.get("start", {}).get("customParameters", {})
-                prompt = params.get("prompt", settings.default_prompt)
-                voice = params.get("voice", settings.supported_voices[0])
-
-                logger.info("Twilio stream %s starting with voice=%s", stream_sid, voice)
-                bridge = OpenAIRealtimeBridge(
-                    websocket=websocket,
-                    stream_sid=stream_sid,
-                    prompt=prompt,
-                    voice=voice,
-                    settings=settings,
-                )
-
-                try:
-                    await bridge.connect()
-                except Exception:  # pragma: no cover - network/runtime failure should log
-                    logger.exception("Failed to connect realtime bridge to OpenAI")
-                    break
-
-                await websocket.send_json(
-                    {
-                        "event": "mark",
-                        "streamSid": stream_sid,
-                        "mark": {"name": "bridge-ready"},
-                    }
-                )
-
-            elif event_type == "media" and bridge:
-                media = payload.get("media", {})
-                audio_chunk = media.get("payload")
-                if audio_chunk:
-                    await bridge.handle_audio_chunk(audio_chunk)
-
-            elif event_type == "stop":
-                logger.info("Twilio stream %s ended", payload.get("streamSid"))
-                break
-
-    except WebSocketDisconnect:
-        logger.info("Twilio websocket disconnected")
+        # The Twilio reader runs in the group's body and the bridge joins the
+        # group once connected, so either side failing tears down the other.
+        async with asyncio.TaskGroup() as tg:
+            try:
+                # Twilio delivers media events as text frames; orjson parses the str directly.
+                async for raw_message in websocket.iter_text():
+                    payload = orjson.loads(raw_message)
+                    event_type = payload.get("event")
+
+                    # Media events arrive ~50 times per second, so they take the first branch.
+                    if event_type == "media":
+                        if handle_audio_chunk is None:
+                            continue
+                        try:
+                            audio_chunk = payload["media"]["payload"]
+                        except (KeyError, TypeError):
+                            continue
+                        if audio_chunk:
+                            handle_audio_chunk(audio_chunk)
+
+                    elif event_type == "connected":
+                        logger.info("Twilio reports stream connection established")
+
+                    elif event_type == "start":
+                        stream_sid = payload.get("streamSid")
+                        params: Dict[str, Any] = payload.get("start", {}).get("customParameters", {})
+                        prompt = params.get("prompt", settings.default_prompt)
+                        voice = params.get("voice", settings.supported_voices[0])
+
+                        logger.info("Twilio stream %s starting with voice=%s", stream_sid, voice)
+                        bridge = OpenAIRealtimeBridge(
+                            websocket=websocket,
+                            stream_sid=stream_sid,
+                            prompt=prompt,
+                            voice=voice,
+                            settings=settings,
+                            pool=realtime_pool,
+                        )
+
+                        try:
+                            await bridge.connect()
+                        except Exception:  # pragma: no cover - network/runtime failure should log
+                            logger.exception("Failed to connect realtime bridge to OpenAI")
+                            break
+
+                        tg.create_task(bridge.run())
+                        handle_audio_chunk = bridge.handle_audio_chunk
+                        bridge.send_mark("bridge-ready")
+
+                    elif event_type == "stop":
+                        logger.info("Twilio stream %s ended", payload.get("streamSid"))
+                        break
+
+            except WebSocketDisconnect:
+                logger.info("Twilio websocket disconnected")
+            finally:
+                if bridge:
+                    bridge.close()
+
+    except* WebSocketDisconnect:
+        logger.info("Twilio websocket disconnected while sending audio")
+    except* Exception:  # pragma: no cover - network/runtime failure should log
+        logger.exception("Realtime bridge failed")
     finally:
-        if bridge:
-            await bridge.close()
         if websocket.client_state not in (WebSocketState.DISCONNECTED, WebSocketState.CLOSING):
             await websocket.close()
 
 
 @app.get("/health")
-async def healthcheck() -> Dict[str, str]:
-    return {"status": "ok"}
+async def healthcheck() -> Response:
+    return Response(_HEALTH_BODY, media_type="application/json")
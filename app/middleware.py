@@ -0,0 +1,62 @@
+from typing import List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+_ALLOW_METHODS = b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"
+_PREFLIGHT_MAX_AGE = b"600"
+
+
+class FastCORS:
+    """Pure ASGI CORS middleware for an allow-any-origin, credentialed policy.
+
+    Behaves like Starlette's ``CORSMiddleware`` configured with ``"*"`` for
+    origins, methods and headers, but skips building request and header objects
+    on every HTTP call. The caller's origin is echoed back because browsers
+    reject a literal ``*`` on credentialed requests. Websocket traffic passes
+    through untouched.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin: Optional[bytes] = None
+        requested_method: Optional[bytes] = None
+        requested_headers: Optional[bytes] = None
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                requested_method = value
+            elif name == b"access-control-request-headers":
+                requested_headers = value
+
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+
+        cors_headers: List[Tuple[bytes, bytes]] = [
+            (b"access-control-allow-origin", origin),
+            (b"access-control-allow-credentials", b"true"),
+            (b"vary", b"Origin"),
+        ]
+
+        if scope["method"] == "OPTIONS" and requested_method is not None:
+            cors_headers.append((b"access-control-allow-methods", _ALLOW_METHODS))
+            cors_headers.append((b"access-control-max-age", _PREFLIGHT_MAX_AGE))
+            if requested_headers:
+                cors_headers.append((b"access-control-allow-headers", requested_headers))
+            await send({"type": "http.response.start", "status": 204, "headers": cors_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_cors(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), *cors_headers]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
@@ -0,0 +1,112 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True, initializedcheck=False
+# distutils: extra_compile_args = -O3 -march=native
+"""Compiled kernels for the resamplers in ``app.services.audio``.
+
+Each kernel fuses the table lookup, the FIR filter and the PCM16 clamp into a
+single pass over the chunk. Filter history is updated in place so the Python
+resampler objects stay the owners of all streaming state.
+"""
+
+import numpy as np
+
+cimport numpy as cnp
+from libc.math cimport lrintf
+
+cnp.import_array()
+
+
+cdef inline short _clamp_pcm16(float value) nogil:
+    cdef long sample = lrintf(value)
+    if sample > 32767:
+        return 32767
+    if sample < -32768:
+        return -32768
+    return <short>sample
+
+
+def upsample_mulaw(
+    const unsigned char[::1] src,
+    const short[::1] decode_table,
+    const float[:, ::1] phases,
+    float[::1] history,
+):
+    """Decode 8kHz mu-law and upsample it to 24kHz PCM16 with a polyphase FIR."""
+    cdef Py_ssize_t n = src.shape[0]
+    cdef Py_ssize_t taps = phases.shape[0]
+    cdef Py_ssize_t factor = phases.shape[1]
+    cdef Py_ssize_t kept = history.shape[0]
+    cdef Py_ssize_t i, j, p
+    cdef float acc
+
+    out_array = np.empty(n * factor, dtype=np.int16)
+    if n == 0:
+        return out_array
+
+    samples_array = np.empty(kept + n, dtype=np.float32)
+    cdef short[::1] out = out_array
+    cdef float[::1] samples = samples_array
+
+    with nogil:
+        for i in range(kept):
+            samples[i] = history[i]
+        for i in range(n):
+            samples[kept + i] = decode_table[src[i]]
+
+        for j in range(n):
+            for p in range(factor):
+                acc = 0.0
+                for i in range(taps):
+                    acc = acc + phases[i, p] * samples[j + i]
+                out[j * factor + p] = _clamp_pcm16(acc)
+
+        for i in range(kept):
+            history[i] = samples[n + i]
+
+    return out_array
+
+
+def downsample_to_mulaw(
+    const short[::1] src,
+    const float[::1] kernel,
+    float[::1] history,
+    Py_ssize_t phase,
+    Py_ssize_t factor,
+    const unsigned char[::1] encode_table,
+):
+    """Low-pass and decimate 24kHz PCM16, then encode the result as mu-law.
+
+    Returns the encoded samples and the decimation phase for the next chunk.
+    """
+    cdef Py_ssize_t n = src.shape[0]
+    cdef Py_ssize_t taps = kernel.shape[0]
+    cdef Py_ssize_t kept = history.shape[0]
+    cdef Py_ssize_t count = (n - phase + factor - 1) // factor if n > phase else 0
+    cdef Py_ssize_t i, j, k
+    cdef float acc
+
+    out_array = np.empty(count, dtype=np.uint8)
+    if n == 0:
+        return out_array, phase
+
+    samples_array = np.empty(kept + n, dtype=np.float32)
+    cdef unsigned char[::1] out = out_array
+    cdef float[::1] samples = samples_array
+
+    with nogil:
+        for i in range(kept):
+            samples[i] = history[i]
+        for i in range(n):
+            samples[kept + i] = src[i]
+
+        for k in range(count):
+            j = phase + k * factor
+            acc = 0.0
+            for i in range(taps):
+                acc = acc + kernel[i] * samples[j + i]
+            out[k] = encode_table[<unsigned short>_clamp_pcm16(acc)]
+
+        for i in range(kept):
+            history[i] = samples[n + i]
+
+    # cdivision makes % follow C semantics, so keep the phase non-negative.
+    return out_array, ((phase - n) % factor + factor) % factor
@@ -0,0 +1,182 @@
+from collections import deque
+from typing import Deque, Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    from app.services import _audio
+except ImportError:  # pragma: no cover - compiled kernels are optional
+    _audio = None
+
+# Twilio streams audio as 8kHz mu-law while OpenAI expects 24kHz PCM16. The
+# conversion is done with lookup tables and a fixed polyphase FIR so every
+# chunk is a handful of vectorized array operations.
+TWILIO_SAMPLE_RATE = 8000
+OPENAI_SAMPLE_RATE = 24000
+SAMPLE_WIDTH = 2  # 16-bit linear PCM
+RESAMPLE_FACTOR = OPENAI_SAMPLE_RATE // TWILIO_SAMPLE_RATE
+FIR_TAPS = 47
+
+_MULAW_BIAS = 0x84
+_MULAW_CLIP = 8159
+_MULAW_SEGMENT_ENDS = np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF])
+
+
+def _build_mulaw_to_pcm() -> np.ndarray:
+    """G.711 mu-law decode table, bit-exact with ``audioop.ulaw2lin``."""
+    ulaw = ~np.arange(256, dtype=np.int32) & 0xFF
+    magnitude = (((ulaw & 0x0F) << 3) + _MULAW_BIAS) << ((ulaw & 0x70) >> 4)
+    pcm = np.where(ulaw & 0x80, _MULAW_BIAS - magnitude, magnitude - _MULAW_BIAS)
+    return pcm.astype(np.int16)
+
+
+def _build_pcm_to_mulaw() -> np.ndarray:
+    """G.711 mu-law encode table indexed by the PCM16 sample viewed as uint16."""
+    pcm = np.arange(65536, dtype=np.int32).astype(np.uint16).view(np.int16).astype(np.int32) >> 2
+    mask = np.where(pcm < 0, 0x7F, 0xFF)
+    magnitude = np.minimum(np.abs(pcm), _MULAW_CLIP) + (_MULAW_BIAS >> 2)
+    segment = np.searchsorted(_MULAW_SEGMENT_ENDS, magnitude)
+    ulaw = (segment << 4) | ((magnitude >> (segment + 1)) & 0x0F)
+    ulaw = np.where(segment >= len(_MULAW_SEGMENT_ENDS), 0x7F, ulaw)
+    return (ulaw ^ mask).astype(np.uint8)
+
+
+def _design_lowpass(taps: int, factor: int) -> np.ndarray:
+    """Hamming-windowed sinc low-pass with its cutoff at ``1 / factor`` of Nyquist."""
+    n = np.arange(taps) - (taps - 1) / 2
+    fir = np.sinc(n / factor) * np.hamming(taps)
+    return (fir / fir.sum()).astype(np.float32)
+
+
+MULAW_TO_PCM = _build_mulaw_to_pcm()
+PCM_TO_MULAW = _build_pcm_to_mulaw()
+_LOWPASS = _design_lowpass(FIR_TAPS, RESAMPLE_FACTOR)
+
+
+def _to_pcm16(samples: np.ndarray) -> np.ndarray:
+    return np.clip(np.rint(samples), -32768, 32767).astype(np.int16)
+
+
+class MulawUpsampler:
+    """Stateful 8kHz mu-law to 24kHz PCM16 converter.
+
+    The tail of the previous chunk is kept as filter history, so feeding a call
+    chunk by chunk produces the same samples as converting it in one go.
+    """
+
+    def __init__(self) -> None:
+        # Split the low-pass into one sub-filter per output phase; each phase
+        # is a short FIR over the original 8kHz samples.
+        phase_len = -(-FIR_TAPS // RESAMPLE_FACTOR)
+        padded = np.zeros(phase_len * RESAMPLE_FACTOR, dtype=np.float32)
+        padded[:FIR_TAPS] = _LOWPASS * RESAMPLE_FACTOR
+        self._phases = padded.reshape(phase_len, RESAMPLE_FACTOR)[::-1].copy()
+        self._history = np.zeros(phase_len - 1, dtype=np.float32)
+
+    def convert(self, mulaw_audio: bytes) -> np.ndarray:
+        if _audio is not None:
+            return _audio.upsample_mulaw(
+                np.frombuffer(mulaw_audio, dtype=np.uint8), MULAW_TO_PCM, self._phases, self._history
+            )
+
+        pcm = MULAW_TO_PCM[np.frombuffer(mulaw_audio, dtype=np.uint8)]
+        if not pcm.size:
+            return pcm
+
+        samples = np.concatenate((self._history, pcm.astype(np.float32)))
+        self._history = samples[len(samples) - len(self._history) :]
+        windows = sliding_window_view(samples, len(self._phases))
+        return _to_pcm16(windows @ self._phases).ravel()
+
+
+class PcmDownsampler:
+    """Stateful 24kHz PCM16 to 8kHz mu-law converter."""
+
+    def __init__(self) -> None:
+        self._kernel = _LOWPASS[::-1].copy()
+        self._history = np.zeros(FIR_TAPS - 1, dtype=np.float32)
+        self._phase = 0
+
+    def convert(self, pcm_audio: bytes) -> np.ndarray:
+        pcm = np.frombuffer(pcm_audio, dtype=np.int16)
+        if _audio is not None:
+            encoded, self._phase = _audio.downsample_to_mulaw(
+                pcm, self._kernel, self._history, self._phase, RESAMPLE_FACTOR, PCM_TO_MULAW
+            )
+            return encoded
+
+        if not pcm.size:
+            return np.empty(0, dtype=np.uint8)
+
+        samples = np.concatenate((self._history, pcm.astype(np.float32)))
+        windows = sliding_window_view(samples, FIR_TAPS)[self._phase :: RESAMPLE_FACTOR]
+        self._history = samples[len(samples) - len(self._history) :]
+        self._phase = (self._phase - len(pcm)) % RESAMPLE_FACTOR
+        return PCM_TO_MULAW[_to_pcm16(windows @ self._kernel).view(np.uint16)]
+
+
+class SilenceGate:
+    """Energy gate that separates speech from line noise in PCM16 chunks.
+
+    The noise floor is seeded from the first chunk and follows quieter chunks
+    quickly. It rises slowly on louder chunks that are not speech and only
+    drifts during speech, so sustained speech cannot drag it up to the speech
+    level. Line noise louder than the seeded floor looks like speech with an
+    almost constant level; once such a run lasts ``steady_chunks`` its mean
+    level becomes the new floor. A short hangover keeps the chunks right after
+    speech, so quiet consonants and gaps between words stay in the audio.
+    """
+
+    speech_ratio = 1.5
+    min_noise_floor = 50.0
+    floor_fall_rate = 0.05
+    floor_rise_rate = 0.01
+    floor_drift_rate = 0.0005
+    hangover_chunks = 8
+    steady_chunks = 40
+    # Per-chunk RMS of stationary noise varies by a few percent, while the
+    # syllable envelope of real speech varies by tens of percent.
+    steady_variation = 0.15
+
+    def __init__(self, noise_floor: Optional[float] = None) -> None:
+        self.noise_floor = noise_floor
+        self._hangover = 0
+        self._speech_levels: Deque[float] = deque(maxlen=self.steady_chunks)
+
+    def is_speech(self, pcm: np.ndarray) -> bool:
+        if not pcm.size:
+            return False
+
+        level = float(np.sqrt(np.mean(np.square(pcm, dtype=np.float32))))
+        if self.noise_floor is None:
+            self.noise_floor = max(self.min_noise_floor, level)
+            return False
+
+        if level >= self.noise_floor * self.speech_ratio:
+            self._speech_levels.append(level)
+            if len(self._speech_levels) == self.steady_chunks:
+                levels = np.fromiter(self._speech_levels, dtype=np.float64)
+                mean = float(levels.mean())
+                if float(levels.std()) < self.steady_variation * mean:
+                    self.noise_floor = mean
+                    self._speech_levels.clear()
+                    self._hangover = 0
+                    return False
+
+            self.noise_floor += self.floor_drift_rate * (level - self.noise_floor)
+            self._hangover = self.hangover_chunks
+            return True
+
+        self._speech_levels.clear()
+        if level < self.noise_floor:
+            self.noise_floor = max(
+                self.min_noise_floor, self.noise_floor + self.floor_fall_rate * (level - self.noise_floor)
+            )
+        else:
+            self.noise_floor += self.floor_rise_rate * (level - self.noise_floor)
+
+        if self._hangover:
+            self._hangover -= 1
+            return True
+        return False
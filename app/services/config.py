@@ -1,7 +1,7 @@
 from functools import lru_cache
-from typing import List, Optional
+from typing import Any, Dict, FrozenSet, List, Optional
 
-from pydantic import BaseSettings, Field, validator
+from pydantic import BaseSettings, Field, PrivateAttr, root_validator, validator
 from urllib.parse import urlparse, urlunparse
 
 
@@ -12,7 +12,11 @@ class Settings(BaseSettings):
     public_base_url: str = Field(..., env="PUBLIC_BASE_URL")
     openai_api_key: str = Field(..., env="OPENAI_API_KEY")
     openai_realtime_model: str = Field("gpt-4o-realtime-preview-2024-12-17", env="OPENAI_REALTIME_MODEL")
+    openai_pool_size: int = Field(2, env="OPENAI_POOL_SIZE")
+    openai_pool_max_age: float = Field(300.0, env="OPENAI_POOL_MAX_AGE")
     supported_voices: List[str] = Field(default_factory=lambda: ["alloy", "ember", "verse"])
+    # Derived from supported_voices for constant-time membership checks.
+    supported_voices_set: FrozenSet[str] = Field(default_factory=frozenset)
     default_prompt: str = Field(
         default=(
             "You are a cheerful assistant that helps callers with scheduling demo calls. "
@@ -20,11 +24,22 @@ class Settings(BaseSettings):
         )
     )
 
+    _base_scheme: str = PrivateAttr()
+    _base_location: str = PrivateAttr()
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
         case_sensitive = False
 
+    def __init__(self, **values: Any) -> None:
+        super().__init__(**values)
+        # Split the validated base URL once so building URLs per request is
+        # plain string concatenation.
+        parsed = urlparse(self.public_base_url)
+        self._base_scheme = parsed.scheme
+        self._base_location = f"{parsed.netloc}{parsed.path}"
+
     @validator("public_base_url")
     def validate_public_url(cls, value: str) -> str:  # noqa: B902
         parsed = urlparse(value)
@@ -45,17 +60,19 @@ class Settings(BaseSettings):
             return [item.strip() for item in value.split(",") if item.strip()]
         return value
 
+    @root_validator(skip_on_failure=True)
+    def build_supported_voices_set(cls, values: Dict[str, Any]) -> Dict[str, Any]:  # noqa: B902
+        values["supported_voices_set"] = frozenset(values["supported_voices"])
+        return values
+
     def build_public_url(
         self, path: str, *, scheme: Optional[str] = None, query: str = ""
     ) -> str:
         """Construct a fully-qualified URL rooted at the configured public base."""
 
-        parsed = urlparse(self.public_base_url)
-        normalized_path = parsed.path.rstrip("/")
         target_path = path if path.startswith("/") else f"/{path}"
-        combined_path = f"{normalized_path}{target_path}"
-
-        return urlunparse((scheme or parsed.scheme, parsed.netloc, combined_path, "", query, ""))
+        url = f"{scheme or self._base_scheme}://{self._base_location}{target_path}"
+        return f"{url}?{query}" if query else url
 
 
 @lru_cache()
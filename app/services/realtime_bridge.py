@@ -1,25 +1,58 @@
 import asyncio
-import base64
-import contextlib
-import json
 import logging
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Any, Awaitable, Callable, Optional
 
-import audioop
+import numpy as np
+import orjson
+import pybase64
 import websockets
 from fastapi import WebSocket
 
+from app.services.audio import (
+    OPENAI_SAMPLE_RATE,
+    SAMPLE_WIDTH,
+    MulawUpsampler,
+    PcmDownsampler,
+    SilenceGate,
+)
 from app.services.config import Settings
+from app.services.realtime_pool import RealtimeConnectionPool
 
 logger = logging.getLogger(__name__)
 
-# Twilio streams audio as 8kHz mu-law while OpenAI expects 24kHz PCM16. These
-# helpers keep the codec conversion logic in one place and make the bridge more
-# reliable.
-TWILIO_SAMPLE_RATE = 8000
-OPENAI_SAMPLE_RATE = 24000
-SAMPLE_WIDTH = 2  # 16-bit linear PCM
+# Inbound audio is buffered as 24kHz PCM16 and sent to OpenAI in ~160ms batches.
+FLUSH_THRESHOLD_BYTES = OPENAI_SAMPLE_RATE * SAMPLE_WIDTH * 160 // 1000
+# Silent chunks are dropped, and a turn is only committed once the caller has
+# been quiet for this long.
+END_OF_TURN_SILENCE_SAMPLES = OPENAI_SAMPLE_RATE * 300 // 1000
+
+# Static control frames are serialized once. They are kept as ``str`` so the
+# websockets client keeps sending them as text frames.
+_COMMIT_AUDIO_BUFFER = '{"type":"input_audio_buffer.commit"}'
+_CREATE_AUDIO_RESPONSE = '{"type":"response.create","response":{"modalities":["audio"]}}'
+
+
+def _dumps(payload: Any) -> str:
+    return orjson.dumps(payload).decode("utf-8")
+
+
+def _make_media_sender(
+    stream_sid: str, queue: "asyncio.Queue[Optional[str]]"
+) -> Callable[[str], None]:
+    """Build a sender that wraps base64 audio in the stream's Twilio media frame.
+
+    Outbound frames only differ by payload, so the JSON envelope is rendered
+    once and each frame is a single concatenation.
+    """
+    prefix = f'{{"event":"media","streamSid":{_dumps(stream_sid)},"media":{{"payload":"'
+    suffix = '"}}'
+    put = queue.put_nowait
+
+    def send_media(payload: str) -> None:
+        put(prefix + payload + suffix)
+
+    return send_media
 
 
 @dataclass
@@ -29,24 +62,28 @@ class OpenAIRealtimeBridge:
     prompt: str
     voice: str
     settings: Settings
+    pool: RealtimeConnectionPool
 
     _openai_ws: Optional[websockets.WebSocketClientProtocol] = field(init=False, default=None)
-    _buffer: List[str] = field(init=False, default_factory=list)
+    _buffer: bytearray = field(init=False, default_factory=bytearray)
     _waiting_for_response: bool = field(init=False, default=False)
-    _bridge_task: Optional[asyncio.Task] = field(init=False, default=None)
-    _flush_threshold: int = field(init=False, default=8)
+    # Each socket is written by a single task draining its outbound queue, so
+    # the read paths never wait on a send. ``None`` tells a writer to stop.
+    _openai_out_q: "asyncio.Queue[Optional[str]]" = field(init=False, default_factory=asyncio.Queue)
+    _twilio_out_q: "asyncio.Queue[Optional[str]]" = field(init=False, default_factory=asyncio.Queue)
+    _flush_threshold: int = field(init=False, default=FLUSH_THRESHOLD_BYTES)
+    # Resamplers keep their filter history across calls so consecutive chunks
+    # convert as one continuous stream.
+    _upsampler: MulawUpsampler = field(init=False, default_factory=MulawUpsampler)
+    _downsampler: PcmDownsampler = field(init=False, default_factory=PcmDownsampler)
+    _silence_gate: SilenceGate = field(init=False, default_factory=SilenceGate)
+    _trailing_silence: int = field(init=False, default=0)
+    _send_media: Callable[[str], None] = field(init=False, repr=False)
 
     async def connect(self) -> None:
-        """Connect to the OpenAI Realtime websocket and configure the session."""
-        headers = {
-            "Authorization": f"Bearer {self.settings.openai_api_key}",
-            "OpenAI-Beta": "realtime=v1",
-        }
-
-        realtime_url = (
-            f"wss://api.openai.com/v1/realtime?model={self.settings.openai_realtime_model}&voice={self.voice}"
-        )
-        self._openai_ws = await websockets.connect(realtime_url, extra_headers=headers)
+        """Take a pre-connected OpenAI Realtime websocket and configure the session."""
+        self._openai_ws = await self.pool.acquire()
+        self._send_media = _make_media_sender(self.stream_sid, self._twilio_out_q)
 
         session_update = {
             "type": "session.update",
@@ -56,12 +93,11 @@ class OpenAIRealtimeBridge:
                 "voice": self.voice,
             },
         }
-        await self._openai_ws.send(json.dumps(session_update))
-        self._bridge_task = asyncio.create_task(self._forward_openai_events())
+        self._openai_out_q.put_nowait(_dumps(session_update))
         logger.info("Connected OpenAI session for stream %s", self.stream_sid)
 
-        await self._openai_ws.send(
-            json.dumps(
+        self._openai_out_q.put_nowait(
+            _dumps(
                 {
                     "type": "response.create",
                     "response": {"modalities": ["audio"], "instructions": self.prompt},
@@ -70,118 +106,138 @@ class OpenAIRealtimeBridge:
         )
         self._waiting_for_response = True
 
-    async def handle_audio_chunk(self, base64_payload: str) -> None:
+    async def run(self) -> None:
+        """Pump both sockets until :meth:`close` is called.
+
+        The OpenAI reader and both writers share a task group, so a failure in
+        any of them cancels the others and propagates to the caller.
+        """
+        assert self._openai_ws is not None
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(self._forward_openai_events())
+                tg.create_task(self._write_openai_messages())
+                tg.create_task(self._write_messages(self._twilio_out_q, self.websocket.send_text))
+        finally:
+            await self._openai_ws.close()
+
+    def send_mark(self, name: str) -> None:
+        """Queue a Twilio mark event behind any audio already sent to the caller."""
+        self._twilio_out_q.put_nowait(
+            _dumps({"event": "mark", "streamSid": self.stream_sid, "mark": {"name": name}})
+        )
+
+    def handle_audio_chunk(self, base64_payload: str) -> None:
         """Convert audio from Twilio and forward it to OpenAI for processing."""
         if not self._openai_ws:
             return
 
-        converted = self._convert_twilio_to_openai(base64_payload)
-        if not converted:
+        try:
+            mulaw_audio = pybase64.b64decode(base64_payload)
+        except ValueError as exc:
+            logger.warning("Unable to decode Twilio audio: %s", exc)
+            return
+
+        converted = self._convert_twilio_to_openai(mulaw_audio)
+        if converted is None:
             return
 
-        self._buffer.append(converted)
+        if self._silence_gate.is_speech(converted):
+            self._buffer += memoryview(converted)
+            self._trailing_silence = 0
+        else:
+            self._trailing_silence += len(converted)
 
-        if len(self._buffer) >= self._flush_threshold and not self._waiting_for_response:
-            await self._flush_audio_buffer()
+        if (
+            len(self._buffer) >= self._flush_threshold
+            and self._trailing_silence >= END_OF_TURN_SILENCE_SAMPLES
+            and not self._waiting_for_response
+        ):
+            self._flush_audio_buffer()
 
-    async def _flush_audio_buffer(self) -> None:
+    def _flush_audio_buffer(self) -> None:
         if not self._buffer or not self._openai_ws:
             return
 
-        for chunk in self._buffer:
-            await self._openai_ws.send(
-                json.dumps({"type": "input_audio_buffer.append", "audio": chunk})
-            )
-
-        await self._openai_ws.send(json.dumps({"type": "input_audio_buffer.commit"}))
-        await self._openai_ws.send(
-            json.dumps(
-                {
-                    "type": "response.create",
-                    "response": {"modalities": ["audio"]},
-                }
-            )
-        )
-        self._waiting_for_response = True
+        audio = pybase64.b64encode_as_string(self._buffer)
         self._buffer.clear()
+        self._openai_out_q.put_nowait(_dumps({"type": "input_audio_buffer.append", "audio": audio}))
+        self._openai_out_q.put_nowait(_COMMIT_AUDIO_BUFFER)
+        self._openai_out_q.put_nowait(_CREATE_AUDIO_RESPONSE)
+        self._waiting_for_response = True
+
+    async def _write_messages(
+        self, queue: "asyncio.Queue[Optional[str]]", send: Callable[[str], Awaitable[None]]
+    ) -> None:
+        """Drain ``queue`` into ``send`` until the stop sentinel is received."""
+        while True:
+            message = await queue.get()
+            if message is None:
+                return
+            await send(message)
+
+    async def _write_openai_messages(self) -> None:
+        assert self._openai_ws is not None
+        await self._write_messages(self._openai_out_q, self._openai_ws.send)
+        # Closing the socket ends the event reader, which lets run() return.
+        await self._openai_ws.close()
 
     async def _forward_openai_events(self) -> None:
         assert self._openai_ws is not None
         async for message in self._openai_ws:
-            payload = json.loads(message)
+            payload = orjson.loads(message)
             event_type = payload.get("type")
 
             if event_type == "response.audio.delta":
-                await self._send_audio_to_twilio(payload.get("delta"))
+                self._send_audio_to_twilio(payload.get("delta"))
 
             elif event_type == "response.completed":
                 self._waiting_for_response = False
-                if self._buffer:
-                    await self._flush_audio_buffer()
+                if self._buffer and self._trailing_silence >= END_OF_TURN_SILENCE_SAMPLES:
+                    self._flush_audio_buffer()
 
             elif event_type == "error":
                 logger.error("OpenAI realtime error: %s", payload)
 
-    async def _send_audio_to_twilio(self, base64_audio: Optional[str]) -> None:
+    def _send_audio_to_twilio(self, base64_audio: Optional[str]) -> None:
         if not base64_audio:
             return
 
-        converted = self._convert_openai_to_twilio(base64_audio)
-        if not converted:
+        try:
+            pcm_audio = pybase64.b64decode(base64_audio)
+        except ValueError as exc:
+            logger.warning("Unable to decode OpenAI audio: %s", exc)
             return
 
-        message = {
-            "event": "media",
-            "streamSid": self.stream_sid,
-            "media": {"payload": converted},
-        }
-        await self.websocket.send_json(message)
+        converted = self._convert_openai_to_twilio(pcm_audio)
+        if converted is None or not converted.size:
+            return
 
-    async def close(self) -> None:
-        if self._buffer and self._openai_ws and not self._waiting_for_response:
-            await self._flush_audio_buffer()
+        self._send_media(pybase64.b64encode_as_string(converted))
 
-        if self._bridge_task:
-            self._bridge_task.cancel()
-            with contextlib.suppress(asyncio.CancelledError):
-                await self._bridge_task
+    def close(self) -> None:
+        """Stop the bridge; :meth:`run` returns once pending OpenAI frames are sent."""
+        if self._buffer and self._openai_ws and not self._waiting_for_response:
+            self._flush_audio_buffer()
 
-        if self._openai_ws:
-            await self._openai_ws.close()
-            self._openai_ws = None
+        # The Twilio stream is ending, so audio still queued for the caller is dropped.
+        while not self._twilio_out_q.empty():
+            self._twilio_out_q.get_nowait()
+        self._twilio_out_q.put_nowait(None)
+        self._openai_out_q.put_nowait(None)
 
-    def _convert_twilio_to_openai(self, base64_payload: str) -> Optional[str]:
+    def _convert_twilio_to_openai(self, mulaw_audio: bytes) -> Optional[np.ndarray]:
         """Translate Twilio mu-law audio into 24kHz PCM16 for OpenAI."""
         try:
-            mulaw_audio = base64.b64decode(base64_payload)
-            linear_pcm = audioop.ulaw2lin(mulaw_audio, SAMPLE_WIDTH)
-            converted, _ = audioop.ratecv(
-                linear_pcm,
-                SAMPLE_WIDTH,
-                1,
-                TWILIO_SAMPLE_RATE,
-                OPENAI_SAMPLE_RATE,
-                None,
-            )
-            return base64.b64encode(converted).decode("utf-8")
-        except (audioop.error, ValueError) as exc:
+            return self._upsampler.convert(mulaw_audio)
+        except ValueError as exc:
             logger.warning("Unable to convert Twilio audio: %s", exc)
             return None
 
-    def _convert_openai_to_twilio(self, base64_payload: str) -> Optional[str]:
+    def _convert_openai_to_twilio(self, pcm_audio: bytes) -> Optional[np.ndarray]:
         """Translate OpenAI 24kHz PCM16 audio back to Twilio mu-law."""
         try:
-            pcm_audio = base64.b64decode(base64_payload)
-            converted, _ = audioop.ratecv(
-                pcm_audio,
-                SAMPLE_WIDTH,
-                1,
-                OPENAI_SAMPLE_RATE,
-                TWILIO_SAMPLE_RATE,
-                None,
-            )
-            mulaw_audio = audioop.lin2ulaw(converted, SAMPLE_WIDTH)
-            return base64.b64encode(mulaw_audio).decode("utf-8")
-        except (audioop.error, ValueError) as exc:
+            return self._downsampler.convert(pcm_audio)
+        except ValueError as exc:
             logger.warning("Unable to convert OpenAI audio: %s", exc)
             return None
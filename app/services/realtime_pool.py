@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Set, Tuple
+
+import websockets
+
+from app.services.config import Settings
+
+logger = logging.getLogger(__name__)
+
+
+async def open_realtime_connection(settings: Settings) -> websockets.WebSocketClientProtocol:
+    """Open a websocket to the OpenAI Realtime API for the configured model."""
+    headers = {
+        "Authorization": f"Bearer {settings.openai_api_key}",
+        "OpenAI-Beta": "realtime=v1",
+    }
+
+    realtime_url = f"wss://api.openai.com/v1/realtime?model={settings.openai_realtime_model}"
+    # Audio frames are small base64 blobs that deflate barely shrinks, so
+    # per-message compression is disabled to save CPU on every frame.
+    return await websockets.connect(realtime_url, extra_headers=headers, compression=None)
+
+
+@dataclass
+class RealtimeConnectionPool:
+    """Keep a few pre-connected OpenAI realtime sockets ready for new calls.
+
+    The TLS and websocket handshakes are paid ahead of time so a call can start
+    talking as soon as Twilio opens its stream. Sockets are handed out once and
+    never returned: a realtime session keeps its conversation history, so it
+    must not be shared between callers.
+    """
+
+    settings: Settings
+
+    _idle: "asyncio.Queue[Tuple[float, websockets.WebSocketClientProtocol]]" = field(
+        init=False, default_factory=asyncio.Queue
+    )
+    _refills: Set[asyncio.Task] = field(init=False, default_factory=set)
+    _closing: Set[asyncio.Task] = field(init=False, default_factory=set)
+
+    async def start(self) -> None:
+        """Begin pre-connecting sockets up to the configured pool size."""
+        self._top_up()
+
+    async def acquire(self) -> websockets.WebSocketClientProtocol:
+        """Return a ready socket, connecting on demand when the pool is empty."""
+        try:
+            while not self._idle.empty():
+                created_at, websocket = self._idle.get_nowait()
+                # Idle sessions can be dropped server-side, so old or closed
+                # sockets are discarded instead of handed to a call. Their close
+                # handshake runs in the background to keep it off call setup.
+                if websocket.open and time.monotonic() - created_at < self.settings.openai_pool_max_age:
+                    return websocket
+                task = asyncio.create_task(websocket.close())
+                self._closing.add(task)
+                task.add_done_callback(self._closing.discard)
+
+            return await open_realtime_connection(self.settings)
+        finally:
+            self._top_up()
+
+    async def close(self) -> None:
+        for task in list(self._refills):
+            task.cancel()
+        await asyncio.gather(*self._refills, *self._closing, return_exceptions=True)
+
+        while not self._idle.empty():
+            _, websocket = self._idle.get_nowait()
+            await websocket.close()
+
+    def _top_up(self) -> None:
+        while self._idle.qsize() + len(self._refills) < self.settings.openai_pool_size:
+            task = asyncio.create_task(self._refill())
+            self._refills.add(task)
+            task.add_done_callback(self._refills.discard)
+
+    async def _refill(self) -> None:
+        try:
+            websocket = await open_realtime_connection(self.settings)
+        except Exception:  # pragma: no cover - network failure should log
+            logger.exception("Unable to pre-connect an OpenAI realtime session")
+            return
+
+        self._idle.put_nowait((time.monotonic(), websocket))
@@ -1,11 +1,28 @@
 from dataclasses import dataclass
 from urllib.parse import urlencode
+from xml.sax.saxutils import escape
 
 from twilio.rest import Client
-from twilio.twiml.voice_response import Connect, Stream, VoiceResponse
 
 from app.services.config import Settings
 
+# The TwiML document has a fixed shape, so it is rendered from a template rather
+# than built as a VoiceResponse object graph on every request.
+_TWIML_TEMPLATE = (
+    '<?xml version="1.0" encoding="UTF-8"?><Response><Connect>'
+    '<Stream track="both_tracks" url="{url}">'
+    '<Parameter name="prompt" value="{prompt}" />'
+    '<Parameter name="voice" value="{voice}" />'
+    "</Stream></Connect></Response>"
+)
+# Same attribute escaping as the twilio library, including whitespace that XML
+# parsers would otherwise normalize away.
+_ATTRIBUTE_ENTITIES = {'"': "&quot;", "\n": "&#10;", "\r": "&#13;", "\t": "&#09;"}
+
+
+def _escape_attribute(value: str) -> str:
+    return escape(value, _ATTRIBUTE_ENTITIES)
+
 
 @dataclass
 class TwilioCallClient:
@@ -13,6 +30,9 @@ class TwilioCallClient:
 
     def __post_init__(self) -> None:
         self._client = Client(self.settings.twilio_account_sid, self.settings.twilio_auth_token)
+        self._stream_url = _escape_attribute(
+            self.settings.build_public_url("/media-stream", scheme="wss")
+        )
 
     def start_call(self, to_number: str, prompt: str, voice: str):
         """Create an outbound call and instruct Twilio to fetch the streaming TwiML."""
@@ -26,14 +46,8 @@ class TwilioCallClient:
 
     def generate_twiml(self, prompt: str, voice: str) -> str:
         """Build the TwiML response that connects the call to our realtime bridge."""
-        response = VoiceResponse()
-        connect = Connect()
-        stream = Stream(
-            url=self.settings.build_public_url("/media-stream", scheme="wss"),
-            track="both_tracks",
+        return _TWIML_TEMPLATE.format(
+            url=self._stream_url,
+            prompt=_escape_attribute(prompt),
+            voice=_escape_attribute(voice),
         )
-        stream.parameter(name="prompt", value=prompt)
-        stream.parameter(name="voice", value=voice)
-        connect.append(stream)
-        response.append(connect)
-        return str(response)
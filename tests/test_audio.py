@@ -0,0 +1,55 @@
+import numpy as np
+
+from app.services.audio import SilenceGate
+
+CHUNK_SAMPLES = 480  # 20ms of 24kHz PCM16, the size of one converted Twilio frame
+
+
+def _chunks(rng: np.random.Generator, levels: np.ndarray) -> list:
+    return [rng.normal(0, level, CHUNK_SAMPLES).clip(-32768, 32767).astype(np.int16) for level in levels]
+
+
+def test_sustained_speech_stays_speech() -> None:
+    rng = np.random.default_rng(0)
+    gate = SilenceGate()
+
+    noise = _chunks(rng, np.full(50, 300.0))
+    assert not any(gate.is_speech(chunk) for chunk in noise[10:])
+
+    # Six seconds of speech at RMS ~3000 with a syllable-rate envelope.
+    t = np.arange(300) * 0.02
+    envelope = 3000 * (1 + 0.5 * np.sin(2 * np.pi * 4 * t))
+    assert all(gate.is_speech(chunk) for chunk in _chunks(rng, envelope))
+
+
+def test_line_noise_is_learned_after_digital_silence() -> None:
+    rng = np.random.default_rng(1)
+    for level in (100.0, 200.0, 400.0):
+        gate = SilenceGate()
+        gate.is_speech(np.zeros(CHUNK_SAMPLES, dtype=np.int16))
+
+        results = [gate.is_speech(chunk) for chunk in _chunks(rng, np.full(500, level))]
+        assert not any(results[100:]), level
+
+
+def test_line_noise_louder_than_first_chunk_is_learned() -> None:
+    rng = np.random.default_rng(3)
+    gate = SilenceGate()
+    gate.is_speech(_chunks(rng, [100.0])[0])
+
+    results = [gate.is_speech(chunk) for chunk in _chunks(rng, np.full(500, 400.0))]
+    assert not any(results[100:])
+
+
+def test_hangover_keeps_short_gaps_then_releases() -> None:
+    rng = np.random.default_rng(2)
+    gate = SilenceGate()
+    for chunk in _chunks(rng, np.full(50, 300.0)):
+        gate.is_speech(chunk)
+
+    for chunk in _chunks(rng, np.full(10, 3000.0)):
+        assert gate.is_speech(chunk)
+
+    trailing = [gate.is_speech(chunk) for chunk in _chunks(rng, np.full(20, 300.0))]
+    assert all(trailing[: SilenceGate.hangover_chunks])
+    assert not any(trailing[SilenceGate.hangover_chunks :])